@@ -1,5 +1,6 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import io
 from utils.excel_processor import ExcelProcessor
 from utils.stock_calculator import StockCalculator
@@ -17,6 +18,26 @@ if 'processed_data' not in st.session_state:
 if 'results' not in st.session_state:
     st.session_state.results = None
 
+@st.cache_resource
+def get_processor():
+    """Shared ExcelProcessor instance, created once per session"""
+    return ExcelProcessor()
+
+@st.cache_resource
+def get_calculator():
+    """Shared StockCalculator instance, created once per session"""
+    return StockCalculator()
+
+@st.cache_data(show_spinner=False)
+def clean_uploaded_data(data):
+    """Clean the uploaded data, cached across reruns"""
+    return get_processor().clean_data(data)
+
+@st.cache_data(show_spinner=False)
+def calculate_results(target_data):
+    """Calculate stock status, cached across reruns"""
+    return get_calculator().calculate_stock_status(target_data)
+
 def main():
     st.title("🍪 Biscuit Stock Management System")
     st.markdown("Upload an Excel file with Material details and set target quantities for each product")
@@ -31,8 +52,8 @@ def main():
     if uploaded_file is not None:
         try:
             # Process the uploaded file
-            processor = ExcelProcessor()
-            data = processor.read_excel_file(uploaded_file)
+            processor = get_processor()
+            data = processor.read_excel_file(uploaded_file.getvalue(), uploaded_file.name)
             
             if data is not None and not data.empty:
                 st.success(f"File uploaded successfully! Found {len(data)} Materials.")
@@ -43,8 +64,8 @@ def main():
                 
                 # Validate required columns
                 if processor.validate_columns(data):
-                    # Clean the data
-                    clean_data = processor.clean_data(data)
+                    # Clean the data (cached across reruns)
+                    clean_data = clean_uploaded_data(data)
                     
                     # Show target quantity input form
                     st.subheader("🎯 Set Target Quantities")
@@ -54,9 +75,8 @@ def main():
                     target_data = create_target_input_form(clean_data)
                     
                     if target_data is not None:
-                        # Calculate stock differences
-                        calculator = StockCalculator()
-                        results = calculator.calculate_stock_status(target_data)
+                        # Calculate stock differences (cached across reruns)
+                        results = calculate_results(target_data)
                         
                         st.session_state.processed_data = target_data
                         st.session_state.results = results
@@ -80,109 +100,64 @@ def main():
 def create_target_input_form(data):
     """Create input form for target quantities"""
     st.markdown("---")
-    
-    # Store target inputs in session state
-    if 'target_inputs' not in st.session_state:
-        st.session_state.target_inputs = {}
-    
-    # Create columns for better layout
-    col1, col2 = st.columns([3, 2])
-    
-    with col1:
-        st.markdown("**Enter target quantities for each Material:**")
-    
-    with col2:
-        if st.button("Calculate Stock Analysis", type="primary"):
-            # Validate that all targets are set
-            missing_targets = []
-            for _, row in data.iterrows():
-                material_no = str(row['Material No'])
-                if material_no not in st.session_state.target_inputs or not st.session_state.target_inputs[material_no]:
-                    missing_targets.append(material_no)
-            
-            if missing_targets:
-                st.error(f"Please set target quantities for Materials: {', '.join(missing_targets)}")
-                return None
-            
-            # Create target data
-            target_data = data.copy()
-            target_boxes = []
-            target_pieces = []
-            
-            for _, row in data.iterrows():
-                material_no = str(row['Material No'])
-                targets = st.session_state.target_inputs[material_no]
-                target_boxes.append(targets['boxes'])
-                target_pieces.append(targets['pieces'])
-            
-            target_data['Target Stock (Boxes)'] = target_boxes
-            target_data['Target Stock (Pieces)'] = target_pieces
-            
-            return target_data
-    
-    # Display input form for each Material
-    st.markdown("---")
-    
-    for idx, row in data.iterrows():
-        material_no = str(row['Material No'])
-        material_desc = row['Material Description']
-        current_boxes = row['Stock in CBB']
-        current_pieces = row['Stock in PKT']
-        pieces_per_box = row['Alt UOM1 Num']
-        
-        # Create expandable section for each Material
-        with st.expander(f"Material: {material_no} - {material_desc}", expanded=False):
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.markdown("**Current Stock:**")
-                st.write(f"CBB: {current_boxes}")
-                st.write(f"PKT: {current_pieces}")
-                st.write(f"Pieces per Box: {pieces_per_box}")
-            
-            with col2:
-                st.markdown("**Target Quantities:**")
-                target_boxes = st.number_input(
-                    "Target Boxes",
-                    min_value=0,
-                    value=0,
-                    step=1,
-                    key=f"target_boxes_{material_no}_{idx}"
-                )
-                
-                target_pieces = st.number_input(
-                    "Target Pieces",
-                    min_value=0,
-                    value=0,
-                    step=1,
-                    key=f"target_pieces_{material_no}_{idx}"
-                )
-            
-            with col3:
-                # Calculate preview
-                total_current = current_boxes * pieces_per_box + current_pieces
-                total_target = target_boxes * pieces_per_box + target_pieces
-                difference = total_target - total_current  # Target - Current
-                
-                st.markdown("**Preview:**")
-                st.write(f"Total Current: {total_current} pieces")
-                st.write(f"Total Target: {total_target} pieces")
-                
-                if difference > 0:
-                    st.error(f"Shortage: {difference} pieces")
-                elif difference < 0:
-                    st.success(f"Excess: {abs(difference)} pieces")
-                else:
-                    st.info("Balanced")
-            
-            # Store the inputs
-            st.session_state.target_inputs[material_no] = {
-                'boxes': target_boxes,
-                'pieces': target_pieces
-            }
-    
+
+    # A single editable grid instead of an expander with three widgets
+    # per Material, so each rerun re-renders one widget regardless of
+    # how many SKUs were uploaded
+    display_columns = [
+        'Material No',
+        'Material Description',
+        'Stock in CBB',
+        'Stock in PKT',
+        'Alt UOM1 Num'
+    ]
+    editor_df = data[display_columns].assign(**{'Target Boxes': 0, 'Target Pieces': 0})
+
+    edited = st.data_editor(
+        editor_df,
+        disabled=display_columns,
+        num_rows="fixed",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'Target Boxes': st.column_config.NumberColumn(min_value=0, step=1),
+            'Target Pieces': st.column_config.NumberColumn(min_value=0, step=1)
+        },
+        key="target_editor"
+    )
+
+    if st.button("Calculate Stock Analysis", type="primary"):
+        targets = edited[['Target Boxes', 'Target Pieces']]
+
+        # Vectorized validation of the edited grid
+        if targets.isna().any().any():
+            st.error("Please set target quantities for every Material.")
+            return None
+        if (targets < 0).any().any():
+            st.error("Target quantities cannot be negative.")
+            return None
+
+        # Materialize the targets as int64 arrays so the calculator gets
+        # integer columns regardless of what dtype the editor hands back
+        return data.assign(**{
+            'Target Stock (Boxes)': edited['Target Boxes'].to_numpy(dtype=np.int64),
+            'Target Stock (Pieces)': edited['Target Pieces'].to_numpy(dtype=np.int64)
+        })
+
     return None
 
+# Color coding for status
+STATUS_CSS = {
+    'Excess': 'background-color: #d4edda; color: #155724',
+    'Shortage': 'background-color: #f8d7da; color: #721c24',
+    'Balanced': 'background-color: #d1ecf1; color: #0c5460'
+}
+
+def style_status_column(status):
+    """Return CSS for the whole Status column in one array lookup"""
+    css_by_code = np.array([STATUS_CSS[cat] for cat in status.cat.categories])
+    return css_by_code[status.cat.codes.to_numpy()]
+
 def display_results(results):
     """Display the calculated stock results"""
     if results is None or results.empty:
@@ -191,39 +166,37 @@ def display_results(results):
     
     st.subheader("📈 Stock Analysis Results")
     
-    # Summary metrics
+    # Summary metrics from a single pass over the Status column
+    counts = results['Status'].value_counts()
     col1, col2, col3, col4 = st.columns(4)
-    
+
     with col1:
-        total_products = len(results)
-        st.metric("Total Products", total_products)
-    
+        st.metric("Total Products", len(results))
+
     with col2:
-        excess_count = len(results[results['Status'] == 'Excess'])
-        st.metric("Products with Excess", excess_count)
-    
+        st.metric("Products with Excess", int(counts.get('Excess', 0)))
+
     with col3:
-        shortage_count = len(results[results['Status'] == 'Shortage'])
-        st.metric("Products with Shortage", shortage_count)
-    
+        st.metric("Products with Shortage", int(counts.get('Shortage', 0)))
+
     with col4:
-        balanced_count = len(results[results['Status'] == 'Balanced'])
-        st.metric("Balanced Products", balanced_count)
+        st.metric("Balanced Products", int(counts.get('Balanced', 0)))
     
     # Detailed results table
     st.subheader("📋 Detailed Results")
     
-    # Color coding for status
-    def highlight_status(val):
-        if val == 'Excess':
-            return 'background-color: #d4edda; color: #155724'
-        elif val == 'Shortage':
-            return 'background-color: #f8d7da; color: #721c24'
-        else:
-            return 'background-color: #d1ecf1; color: #0c5460'
-    
-    styled_results = results.style.map(highlight_status, subset=['Status'])
-    st.dataframe(styled_results, use_container_width=True)
+    # Styler rendering is O(rows * cols) per rerun, so only style a
+    # bounded preview; the full table stays unstyled behind an expander
+    # that Streamlit renders lazily
+    preview_rows = 50
+    if len(results) > preview_rows:
+        preview = results.head(preview_rows)
+        st.dataframe(preview.style.apply(style_status_column, subset=['Status']), use_container_width=True)
+        st.caption(f"Showing the first {preview_rows} of {len(results)} rows.")
+        with st.expander(f"Show all {len(results)} rows"):
+            st.dataframe(results, use_container_width=True)
+    else:
+        st.dataframe(results.style.apply(style_status_column, subset=['Status']), use_container_width=True)
     
     # Filter options
     st.subheader("🔍 Filter Results")
@@ -241,44 +214,45 @@ def display_results(results):
             filtered_results = results[results['Status'] == status_filter]
             st.dataframe(filtered_results, use_container_width=True)
     
-    # Export functionality
-    if st.button("📥 Export Results to Excel"):
-        export_to_excel(results)
-
-def export_to_excel(results):
-    """Export results to Excel file"""
+    # Export functionality; the report bytes are cached, so reruns and
+    # repeated downloads reuse the same serialized workbook
     try:
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            results.to_excel(writer, sheet_name='Stock Analysis', index=False)
-            
-            # Add summary sheet
-            summary_data = {
-                'Metric': ['Total Products', 'Products with Excess', 'Products with Shortage', 'Balanced Products'],
-                'Count': [
-                    len(results),
-                    len(results[results['Status'] == 'Excess']),
-                    len(results[results['Status'] == 'Shortage']),
-                    len(results[results['Status'] == 'Balanced'])
-                ]
-            }
-            summary_df = pd.DataFrame(summary_data)
-            summary_df.to_excel(writer, sheet_name='Summary', index=False)
-        
-        output.seek(0)
-        
         st.download_button(
             label="📥 Download Excel Report",
-            data=output.getvalue(),
+            data=build_excel_report(results),
             file_name="stock_analysis_report.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
-        
-        st.success("✅ Excel report generated successfully!")
-        
     except Exception as e:
         st.error(f"❌ Error generating Excel report: {str(e)}")
 
+@st.cache_data(show_spinner=False)
+def build_excel_report(results):
+    """Serialize results to Excel bytes, cached on the results frame"""
+    output = io.BytesIO()
+    # xlsxwriter writes faster and leaner than openpyxl. Its
+    # constant_memory mode is not usable here: to_excel emits cells
+    # column-by-column, and the streaming writer silently drops
+    # writes to rows it has already flushed.
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        results.to_excel(writer, sheet_name='Stock Analysis', index=False)
+
+        # Add summary sheet (one scan of the Status column)
+        counts = results['Status'].value_counts()
+        summary_data = {
+            'Metric': ['Total Products', 'Products with Excess', 'Products with Shortage', 'Balanced Products'],
+            'Count': [
+                len(results),
+                int(counts.get('Excess', 0)),
+                int(counts.get('Shortage', 0)),
+                int(counts.get('Balanced', 0))
+            ]
+        }
+        summary_df = pd.DataFrame(summary_data)
+        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+
+    return output.getvalue()
+
 def display_required_format():
     """Display the required Excel file format"""
     st.subheader("📋 Required Excel File Format")
@@ -1,7 +1,58 @@
+import io
+
 import pandas as pd
 import streamlit as st
 from typing import Optional
 
+@st.cache_data(show_spinner=False)
+def _read_excel_cached(file_bytes: bytes, name: str) -> pd.DataFrame:
+    """
+    Parse Excel file bytes into a DataFrame, cached across Streamlit reruns
+
+    The cache is keyed on the file bytes and name, so the workbook parse
+    (calamine, falling back to openpyxl) happens once per uploaded file
+    instead of on every widget interaction.
+
+    Args:
+        file_bytes: Raw bytes of the uploaded Excel file
+        name: Original file name (part of the cache key)
+
+    Returns:
+        DataFrame with raw file contents
+    """
+    dtype = {
+        'Material No': 'string',
+        'Material Description': 'string',
+        'Stock in CBB': 'Int64',
+        'Stock in PKT': 'Int64',
+        'Alt UOM1 Num': 'Int64'
+    }
+
+    # Only materialize the columns we actually use; a callable keeps
+    # missing columns a validation error instead of a read error
+    usecols = lambda col: str(col).strip() in ExcelProcessor.REQUIRED_COLUMNS
+
+    try:
+        # calamine is much faster and lighter on memory than openpyxl
+        df = pd.read_excel(io.BytesIO(file_bytes), engine='calamine',
+                           usecols=usecols)
+    except Exception:
+        # Fall back to openpyxl for files calamine cannot handle
+        df = pd.read_excel(io.BytesIO(file_bytes), engine='openpyxl',
+                           usecols=usecols)
+
+    # Clean column names (remove extra spaces)
+    df.columns = df.columns.str.strip()
+
+    # Apply dtypes after the header cleanup so columns with padded
+    # headers (which usecols accepts) still get their final dtype
+    df = df.astype({col: t for col, t in dtype.items() if col in df.columns})
+
+    # Remove empty rows
+    df = df.dropna(how='all')
+
+    return df
+
 class ExcelProcessor:
     """Handles Excel file processing and validation"""
     
@@ -13,33 +64,28 @@ class ExcelProcessor:
         'Alt UOM1 Num'
     ]
     
-    def read_excel_file(self, uploaded_file) -> Optional[pd.DataFrame]:
+    def read_excel_file(self, file_bytes: bytes, name: str) -> Optional[pd.DataFrame]:
         """
         Read and validate Excel file
-        
+
         Args:
-            uploaded_file: Streamlit uploaded file object
-            
+            file_bytes: Raw bytes of the uploaded Excel file
+            name: Original file name
+
         Returns:
             DataFrame with processed data or None if error
         """
         try:
-            # Read Excel file
-            df = pd.read_excel(uploaded_file, engine='openpyxl')
-            
+            # Read Excel file (cached across reruns)
+            df = _read_excel_cached(file_bytes, name)
+
             # Basic validation
             if df.empty:
                 st.error("The uploaded file is empty.")
                 return None
-            
-            # Clean column names (remove extra spaces)
-            df.columns = df.columns.str.strip()
-            
-            # Remove empty rows
-            df = df.dropna(how='all')
-            
+
             return df
-            
+
         except Exception as e:
             st.error(f"Error reading Excel file: {str(e)}")
             return None
@@ -85,39 +131,38 @@ class ExcelProcessor:
                 'Alt UOM1 Num'
             ]
             
-            for col in numeric_columns:
-                # Convert to numeric, errors='coerce' will make invalid values NaN
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-                # Check for NaN values
-                nan_count = df[col].isna().sum()
-                if nan_count > 0:
-                    st.error(f"Invalid numeric values found in column: {col}")
-                    return False
-                
-                # Check for negative values
-                negative_count = df[col].lt(0).sum()
-                if negative_count > 0:
-                    st.error(f"Negative values found in column: {col}")
-                    return False
-            
+            # Dtypes are enforced by the reader, so only check values here.
+            # np.any on the raw boolean masks short-circuits on the first
+            # hit; the per-column breakdowns and counts are only computed
+            # on the failure paths
+            num = df[numeric_columns]
+
+            nan_mask = num.isna().to_numpy()
+            if nan_mask.any():
+                bad_columns = num.columns[nan_mask.any(axis=0)]
+                st.error(f"Invalid numeric values found in column: {', '.join(bad_columns)}")
+                return False
+
+            negative_mask = (num < 0).to_numpy()
+            if negative_mask.any():
+                bad_columns = num.columns[negative_mask.any(axis=0)]
+                st.error(f"Negative values found in column: {', '.join(bad_columns)}")
+                return False
+
             # Check for zero pieces per box
-            zero_pieces_count = (df['Alt UOM1 Num'] == 0).sum()
-            if zero_pieces_count > 0:
+            if (num['Alt UOM1 Num'] == 0).to_numpy().any():
                 st.error("Alt UOM1 Num (Pieces per Box) cannot be zero")
                 return False
-            
-            # Check for empty Material No - convert to numeric first to handle float values properly
-            df_temp = df.copy()
-            df_temp['Material No'] = pd.to_numeric(df_temp['Material No'], errors='coerce')
-            empty_material_count = df_temp['Material No'].isna().sum()
-            if empty_material_count > 0:
-                st.warning(f"Found {empty_material_count} rows with empty/invalid Material No. These will be excluded from analysis.")
+
+            # Check for empty Material No
+            empty_material = df['Material No'].isna().to_numpy()
+            if empty_material.any():
+                st.warning(f"Found {int(empty_material.sum())} rows with empty/invalid Material No. These will be excluded from analysis.")
                 # Don't return False here, let the clean_data function handle the removal
-                
-            empty_desc_count = df['Material Description'].isna().sum() + (df['Material Description'] == '').sum()
-            if empty_desc_count > 0:
-                st.warning(f"Found {empty_desc_count} rows with empty Material Description. These will be excluded from analysis.")
+
+            empty_desc = (df['Material Description'].isna() | (df['Material Description'] == '')).to_numpy()
+            if empty_desc.any():
+                st.warning(f"Found {int(empty_desc.sum())} rows with empty Material Description. These will be excluded from analysis.")
                 # Don't return False here, let the clean_data function handle the removal
             
             return True
@@ -136,31 +181,28 @@ class ExcelProcessor:
         Returns:
             Cleaned DataFrame
         """
-        # Convert Material No to string and remove any null/nan rows first
-        # First convert to numeric to handle float values, then to int, then to string to remove .0
-        df['Material No'] = pd.to_numeric(df['Material No'], errors='coerce')
-        df = df.dropna(subset=['Material No'])  # Remove rows with null Material No
-        df['Material No'] = df['Material No'].astype(int).astype(str)
-        
-        # Also remove rows with empty Material Description
-        df = df.dropna(subset=['Material Description'])
-        df = df[df['Material Description'].str.strip() != '']
-        
+        # Material No arrives as string dtype straight from the reader;
+        # remove rows with missing Material No or Material Description
+        df = df.dropna(subset=['Material No', 'Material Description'])
+
+        # Trim whitespace and normalize material numbers that came from
+        # float-formatted cells ("9000579.0" -> "9000579")
+        df['Material No'] = df['Material No'].str.strip().str.replace(r'\.0+$', '', regex=True)
+        df['Material Description'] = df['Material Description'].str.strip()
+
+        # Keep only valid numeric material numbers and non-empty
+        # descriptions, validated in one vectorized regex pass
+        df = df[df['Material No'].str.fullmatch(r'\d+') & (df['Material Description'] != '')]
+
         # Remove duplicate Material No (keep first occurrence)
         df = df.drop_duplicates(subset=['Material No'], keep='first')
-        
-        # Ensure integer values for pieces and boxes
+
+        # Convert nullable Int64 from the reader to plain int64 for fast arithmetic
         integer_columns = [
             'Stock in CBB',
             'Stock in PKT',
             'Alt UOM1 Num'
         ]
-        
-        for col in integer_columns:
-            df[col] = df[col].astype(int)
-        
-        # Trim whitespace from Material No and descriptions
-        df['Material No'] = df['Material No'].str.strip()
-        df['Material Description'] = df['Material Description'].str.strip()
-        
+        df = df.astype({col: 'int64' for col in integer_columns})
+
         return df
@@ -1,7 +1,66 @@
 import pandas as pd
 import numpy as np
+from numba import njit, types
 from typing import Dict, Any
 
+# Status categories, in JIT-kernel code order
+_STATUS_CATEGORIES = ['Balanced', 'Shortage', 'Excess']
+
+# Explicit kernel signature; inputs are readonly because pandas hands out
+# read-only views under copy-on-write
+_KERNEL_INPUT = types.Array(types.int64, 1, 'C', readonly=True)
+_KERNEL_SIGNATURE = types.Tuple((
+    types.int64[:], types.int64[:], types.int64[:], types.int64[:], types.int64[:],
+    types.int8[:], types.float64[:]
+))(_KERNEL_INPUT, _KERNEL_INPUT, _KERNEL_INPUT, _KERNEL_INPUT, _KERNEL_INPUT)
+
+@njit(_KERNEL_SIGNATURE, cache=True, fastmath=True)
+def _compute_stock_kernel(cbb, pkt, tbox, tpcs, alt):
+    """
+    JIT-compiled numeric core of the stock calculation
+
+    Runs the mul-add, divmod, status classification and percentage for
+    all SKUs in one compiled loop over int64 arrays. The explicit
+    signature specializes the kernel ahead of time, so calls skip the
+    type-dispatch step, and cache=True persists the compiled kernel on
+    disk so the JIT cost is paid once per install, not per Streamlit
+    rerun.
+
+    Returns:
+        Tuple of (total_cur, total_tgt, diff, dboxes, drem, status, pct)
+        where status is 0=Balanced, 1=Shortage, 2=Excess
+    """
+    n = cbb.shape[0]
+    total_cur = np.empty(n, np.int64)
+    total_tgt = np.empty(n, np.int64)
+    diff = np.empty(n, np.int64)
+    dboxes = np.empty(n, np.int64)
+    drem = np.empty(n, np.int64)
+    status = np.empty(n, np.int8)
+    pct = np.empty(n, np.float64)
+
+    for i in range(n):
+        cur = cbb[i] * alt[i] + pkt[i]
+        tgt = tbox[i] * alt[i] + tpcs[i]
+        d = tgt - cur
+
+        total_cur[i] = cur
+        total_tgt[i] = tgt
+        diff[i] = d
+        dboxes[i] = d // alt[i]
+        drem[i] = d % alt[i]
+
+        if d > 0:
+            status[i] = 1
+        elif d < 0:
+            status[i] = 2
+        else:
+            status[i] = 0
+
+        pct[i] = round(d / tgt * 100, 2) if tgt != 0 else 0.0
+
+    return total_cur, total_tgt, diff, dboxes, drem, status, pct
+
 class StockCalculator:
     """Handles stock calculations and analysis"""
     
@@ -15,126 +74,60 @@ class StockCalculator:
         Returns:
             DataFrame with calculated results
         """
-        results = df.copy()
-        
-        # Ensure all numeric columns are properly converted
-        results['Stock in CBB'] = pd.to_numeric(results['Stock in CBB'], errors='coerce')
-        results['Stock in PKT'] = pd.to_numeric(results['Stock in PKT'], errors='coerce')
-        results['Target Stock (Boxes)'] = pd.to_numeric(results['Target Stock (Boxes)'], errors='coerce')
-        results['Target Stock (Pieces)'] = pd.to_numeric(results['Target Stock (Pieces)'], errors='coerce')
-        results['Alt UOM1 Num'] = pd.to_numeric(results['Alt UOM1 Num'], errors='coerce')
-        
-        # Calculate total current stock in pieces
-        results['Total Current Pieces'] = (
-            results['Stock in CBB'] * results['Alt UOM1 Num'] + 
-            results['Stock in PKT']
-        )
-        
-        # Calculate total target stock in pieces
-        results['Total Target Pieces'] = (
-            results['Target Stock (Boxes)'] * results['Alt UOM1 Num'] + 
-            results['Target Stock (Pieces)']
-        )
-        
-        # Calculate difference in pieces (Target - Current)
-        # Target = What you need, Current = What you have
+        # Contiguous int64 arrays for the JIT kernel. clean_data already
+        # delivers int64 columns, so this is a view in the common case;
+        # the dtype argument is the only (single-cast) safety net
+        cbb = np.ascontiguousarray(df['Stock in CBB'].to_numpy(), dtype=np.int64)
+        pkt = np.ascontiguousarray(df['Stock in PKT'].to_numpy(), dtype=np.int64)
+        tbox = np.ascontiguousarray(df['Target Stock (Boxes)'].to_numpy(), dtype=np.int64)
+        tpcs = np.ascontiguousarray(df['Target Stock (Pieces)'].to_numpy(), dtype=np.int64)
+        alt = np.ascontiguousarray(df['Alt UOM1 Num'].to_numpy(), dtype=np.int64)
+
+        # Difference in pieces is Target - Current:
         # Positive = Shortage (need more), Negative = Excess (have more than needed)
-        results['Difference (Pieces)'] = (
-            results['Total Target Pieces'] - results['Total Current Pieces']
+        total_cur, total_tgt, diff, dboxes, drem, status_code, pct = \
+            _compute_stock_kernel(cbb, pkt, tbox, tpcs, alt)
+
+        # Categorical dtype makes every downstream Status comparison an
+        # int8 compare instead of a per-row string compare
+        status = pd.Categorical.from_codes(status_code, categories=_STATUS_CATEGORIES)
+
+        # Formatted difference strings from vectorized masks
+        shortage = status_code == 1
+        excess = status_code == 2
+
+        boxes = np.abs(dboxes).astype(str)
+        pieces = np.abs(drem).astype(str)
+
+        excess_shortage_boxes = np.select(
+            [shortage, excess],
+            [np.char.add(np.char.add('+', boxes), ' boxes needed'),
+             np.char.add(np.char.add('-', boxes), ' boxes extra')],
+            default='0 boxes'
+        )
+        excess_shortage_pieces = np.select(
+            [shortage, excess],
+            [np.char.add(np.char.add('+', pieces), ' pieces needed'),
+             np.char.add(np.char.add('-', pieces), ' pieces extra')],
+            default='0 pieces'
         )
-        
 
-        
-        # Convert difference to boxes and remaining pieces
-        results['Difference (Boxes)'] = results['Difference (Pieces)'] // results['Pieces per Box']
-        results['Difference (Remaining Pieces)'] = results['Difference (Pieces)'] % results['Pieces per Box']
-        
-        # Determine status
-        results['Status'] = results['Difference (Pieces)'].apply(self._determine_status)
-        
-        # Create formatted difference strings
-        results['Excess/Shortage (Boxes)'] = results.apply(self._format_box_difference, axis=1)
-        results['Excess/Shortage (Pieces)'] = results.apply(self._format_piece_difference, axis=1)
-        
-        # Calculate percentage difference
-        results['Percentage Difference'] = (
-            (results['Difference (Pieces)'] / results['Total Target Pieces']) * 100
-        ).round(2)
-        
-        # Select and reorder columns for final output
-        output_columns = [
-            'SKU',
-            'Product Name',
-            'Current Stock (Boxes)',
-            'Current Stock (Pieces)',
-            'Target Stock (Boxes)',
-            'Target Stock (Pieces)',
-            'Total Current Pieces',
-            'Total Target Pieces',
-            'Status',
-            'Excess/Shortage (Boxes)',
-            'Excess/Shortage (Pieces)',
-            'Percentage Difference'
-        ]
-        
-        return results[output_columns]
-    
-    def _determine_status(self, difference: int) -> str:
-        """
-        Determine stock status based on difference
-        
-        Args:
-            difference: Difference in pieces (Target - Current)
-            
-        Returns:
-            Status string
-        """
-        if difference > 0:
-            return 'Shortage'  # Need more stock
-        elif difference < 0:
-            return 'Excess'    # Have more than needed
-        else:
-            return 'Balanced'
-    
-    def _format_box_difference(self, row: pd.Series) -> str:
-        """
-        Format box difference for display
-        
-        Args:
-            row: Row data
-            
-        Returns:
-            Formatted string
-        """
-        boxes = abs(row['Difference (Boxes)'])
-        status = row['Status']
-        
-        if status == 'Balanced':
-            return '0 boxes'
-        elif status == 'Shortage':
-            return f'+{boxes} boxes needed'
-        else:  # Excess
-            return f'-{boxes} boxes extra'
-    
-    def _format_piece_difference(self, row: pd.Series) -> str:
-        """
-        Format piece difference for display
-        
-        Args:
-            row: Row data
-            
-        Returns:
-            Formatted string
-        """
-        pieces = abs(row['Difference (Remaining Pieces)'])
-        status = row['Status']
-        
-        if status == 'Balanced':
-            return '0 pieces'
-        elif status == 'Shortage':
-            return f'+{pieces} pieces needed'
-        else:  # Excess
-            return f'-{pieces} pieces extra'
+        # Assemble the final output in a single DataFrame construction
+        return pd.DataFrame({
+            'Material No': df['Material No'].to_numpy(),
+            'Material Description': df['Material Description'].to_numpy(),
+            'Stock in CBB': cbb,
+            'Stock in PKT': pkt,
+            'Target Stock (Boxes)': tbox,
+            'Target Stock (Pieces)': tpcs,
+            'Total Current Pieces': total_cur,
+            'Total Target Pieces': total_tgt,
+            'Difference (Pieces)': diff,
+            'Status': status,
+            'Excess/Shortage (Boxes)': excess_shortage_boxes,
+            'Excess/Shortage (Pieces)': excess_shortage_pieces,
+            'Percentage Difference': pct
+        })
     
     def get_summary_statistics(self, results: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -147,13 +140,20 @@ class StockCalculator:
             Dictionary with summary statistics
         """
         total_products = len(results)
-        excess_products = len(results[results['Status'] == 'Shortage'])
-        shortage_products = len(results[results['Status'] == 'Excess'])
-        balanced_products = len(results[results['Status'] == 'Balanced'])
-        
-        # Calculate total excess and shortage in pieces
-        total_excess_pieces = results[results['Status'] == 'Excess']['Difference (Pieces)'].sum()
-        total_shortage_pieces = abs(results[results['Status'] == 'Shortage']['Difference (Pieces)'].sum())
+
+        # One grouped pass over Status gives both the per-status counts
+        # and the piece totals, replacing six separate mask scans (and
+        # fixing the swapped excess/shortage counts)
+        grouped = results.groupby('Status', observed=True)['Difference (Pieces)'].agg(['size', 'sum'])
+        sizes = grouped['size']
+        sums = grouped['sum']
+
+        excess_products = int(sizes.get('Excess', 0))
+        shortage_products = int(sizes.get('Shortage', 0))
+        balanced_products = int(sizes.get('Balanced', 0))
+
+        total_excess_pieces = sums.get('Excess', 0)
+        total_shortage_pieces = abs(sums.get('Shortage', 0))
         
         return {
             'total_products': total_products,
@@ -177,9 +177,10 @@ class StockCalculator:
         Returns:
             DataFrame with top excess products
         """
-        excess_products = results[results['Status'] == 'Excess'].copy()
+        excess_products = results.loc[results['Status'] == 'Excess']
         if len(excess_products) == 0:
             return pd.DataFrame()
+        # nlargest already returns a new DataFrame, no defensive copy needed
         return excess_products.nlargest(top_n, 'Difference (Pieces)')
     
     def get_top_shortage_products(self, results: pd.DataFrame, top_n: int = 5) -> pd.DataFrame:
@@ -193,7 +194,8 @@ class StockCalculator:
         Returns:
             DataFrame with top shortage products
         """
-        shortage_products = results[results['Status'] == 'Shortage'].copy()
+        shortage_products = results.loc[results['Status'] == 'Shortage']
         if len(shortage_products) == 0:
             return pd.DataFrame()
+        # nsmallest already returns a new DataFrame, no defensive copy needed
         return shortage_products.nsmallest(top_n, 'Difference (Pieces)')